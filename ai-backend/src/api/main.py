@@ -4,30 +4,93 @@ ChatConnect AI Backend - FastAPI Application
 Widget Light: Simplified AI chat backend for embedded widgets.
 """
 
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
 import time
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 
+import asyncpg
+import httpx
+import orjson
+import redis.asyncio as redis
 import structlog
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import ORJSONResponse
+from qdrant_client import AsyncQdrantClient
 
+from src.api.middleware import CORSASGIMiddleware, RequestLoggingMiddleware
 from src.api.routes import router as api_router
 from src.config.settings import settings
 
-# Configure structured logging
+# Resolved once per process; refreshed in forked children in case the app is
+# imported before workers fork (e.g. gunicorn preload_app)
+_HOSTNAME = socket.gethostname()
+_PID = os.getpid()
+
+
+def _refresh_pid() -> None:
+    """Update the cached pid in a forked child process."""
+    global _PID
+    _PID = os.getpid()
+
+
+os.register_at_fork(after_in_child=_refresh_pid)
+
+
+def _add_process_info(logger, method_name: str, event_dict: dict) -> dict:
+    """Add cached hostname and pid to every log event."""
+    event_dict["hostname"] = _HOSTNAME
+    event_dict["pid"] = _PID
+    return event_dict
+
+
+def _orjson_dumps(obj, **kwargs) -> str:
+    """
+    Serialize log events with orjson (stdlib loggers expect str, not bytes).
+    
+    Falls back to stdlib json for values orjson rejects outright (e.g. ints
+    beyond 64 bits), and finally to repr() of each value, so a log call
+    never raises.
+    """
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, **kwargs).decode()
+    except orjson.JSONEncodeError:
+        pass
+    try:
+        return json.dumps(obj, **kwargs)
+    except (TypeError, ValueError):
+        return json.dumps({
+            str(key): value if isinstance(value, str | int | float | bool | None) else repr(value)
+            for key, value in obj.items()
+        })
+
+
+# Configure structured logging (ConsoleRenderer formats exceptions itself)
+if settings.log_level == "debug":
+    _log_renderers = [structlog.dev.ConsoleRenderer()]
+else:
+    _log_renderers = [
+        structlog.processors.format_exc_info,
+        structlog.processors.JSONRenderer(serializer=_orjson_dumps),
+    ]
+
+# structlog hands rendered events to stdlib logging; neither uvicorn nor
+# gunicorn configures the root logger, so give it a handler and level here
+logging.basicConfig(format="%(message)s", stream=sys.stdout, level=settings.log_level.upper())
+logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per LLM call otherwise
+
 structlog.configure(
     processors=[
-        structlog.stdlib.filter_by_level,
+        structlog.stdlib.filter_by_level,  # first, so dropped events skip the chain
+        _add_process_info,
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
         structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer() if settings.log_level != "debug" 
-        else structlog.dev.ConsoleRenderer(),
+        *_log_renderers,
     ],
     wrapper_class=structlog.stdlib.BoundLogger,
     context_class=dict,
@@ -42,26 +105,53 @@ logger = structlog.get_logger()
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
+    event_loop = type(asyncio.get_running_loop())
     logger.info(
         "application_starting",
         host=settings.host,
         port=settings.port,
         log_level=settings.log_level,
+        event_loop=event_loop.__name__,
     )
+    if not event_loop.__module__.startswith("uvloop"):
+        logger.warning("event_loop_not_uvloop", event_loop=event_loop.__name__)
     
-    # TODO: Initialize services
-    # - Database connection pool
-    # - Redis connection
-    # - Qdrant client
-    
-    logger.info("application_started")
-    
-    yield
-    
-    # Shutdown
-    logger.info("application_shutting_down")
-    
-    # TODO: Cleanup services
+    # Initialize shared clients once per worker so requests reuse pooled
+    # connections instead of opening new ones. Each close is registered as
+    # soon as its client exists, so one failing close (or a failed startup)
+    # does not leak the others.
+    async with AsyncExitStack() as clients:
+        app.state.pg = await asyncpg.create_pool(
+            settings.database_url,
+            min_size=settings.database_pool_min_size,
+            max_size=settings.database_pool_max_size,
+        )
+        clients.push_async_callback(app.state.pg.close)
+        
+        app.state.redis = redis.from_url(settings.redis_url)
+        clients.push_async_callback(app.state.redis.aclose)
+        
+        app.state.qdrant = AsyncQdrantClient(
+            url=settings.qdrant_url,
+            api_key=settings.qdrant_api_key,
+        )
+        clients.push_async_callback(app.state.qdrant.close)
+        
+        app.state.http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+            ),
+        )
+        clients.push_async_callback(app.state.http.aclose)
+        
+        logger.info("application_started")
+        
+        yield
+        
+        # Shutdown (clients are closed in reverse order on exiting the stack)
+        logger.info("application_shutting_down")
     
     logger.info("application_stopped")
 
@@ -72,50 +162,49 @@ app = FastAPI(
     description="Widget Light - Simplified AI chat backend for embedded widgets",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately in production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    CORSASGIMiddleware,
+    allow_origin=settings.cors_allow_origin,  # Configure appropriately in production
+    allow_credentials=settings.cors_allow_credentials,
 )
 
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests."""
-    start_time = time.time()
-    
-    # Generate request ID
-    request_id = request.headers.get("X-Request-ID", f"req_{int(start_time * 1000)}")
-    
-    # Add to request state
-    request.state.request_id = request_id
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Calculate duration
-    duration_ms = int((time.time() - start_time) * 1000)
-    
-    # Log request
-    logger.info(
-        "http_request",
-        request_id=request_id,
-        method=request.method,
-        path=request.url.path,
-        status_code=response.status_code,
-        duration_ms=duration_ms,
-    )
-    
-    # Add request ID to response headers
-    response.headers["X-Request-ID"] = request_id
-    
-    return response
+# Request ID + logging middleware (outermost, so it also sees CORS responses)
+app.add_middleware(
+    RequestLoggingMiddleware,
+    excluded_paths=settings.log_excluded_paths,
+    log_request_start=settings.log_request_start,
+)
+
+
+# Precomputed JSON bodies (only the request ID / timestamp vary per call)
+_ERROR_BODY_PREFIX = orjson.dumps({
+    "error": {
+        "code": "INTERNAL_ERROR",
+        "message": "An unexpected error occurred",
+    },
+})[:-1] + b',"request_id":'
+
+_ROOT_BODY = orjson.dumps({
+    "service": "chatconnect-ai-backend",
+    "version": "0.1.0",
+    "status": "running",
+})
+
+# TODO: Check actual service health (DB, Redis, Qdrant)
+_HEALTH_BODY_PREFIX = b'{"status":"healthy","timestamp":'
+_HEALTH_BODY_SUFFIX = b"," + orjson.dumps({
+    "version": "0.1.0",
+    "services": {
+        "database": True,  # TODO: Actually check
+        "redis": True,  # TODO: Actually check
+        "qdrant": True,  # TODO: Actually check
+    },
+})[1:]
 
 
 # Global exception handler
@@ -131,15 +220,10 @@ async def global_exception_handler(request: Request, exc: Exception):
         error_type=type(exc).__name__,
     )
     
-    return JSONResponse(
+    return Response(
         status_code=500,
-        content={
-            "error": {
-                "code": "INTERNAL_ERROR",
-                "message": "An unexpected error occurred",
-            },
-            "request_id": request_id,
-        },
+        content=_ERROR_BODY_PREFIX + orjson.dumps(request_id) + b"}",
+        media_type="application/json",
     )
 
 
@@ -151,25 +235,14 @@ app.include_router(api_router)
 @app.get("/")
 async def root():
     """Root endpoint."""
-    return {
-        "service": "chatconnect-ai-backend",
-        "version": "0.1.0",
-        "status": "running",
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 # Health check endpoint
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    # TODO: Check actual service health (DB, Redis, Qdrant)
-    return {
-        "status": "healthy",
-        "timestamp": time.time(),
-        "version": "0.1.0",
-        "services": {
-            "database": True,  # TODO: Actually check
-            "redis": True,  # TODO: Actually check
-            "qdrant": True,  # TODO: Actually check
-        },
-    }
+    return Response(
+        content=_HEALTH_BODY_PREFIX + orjson.dumps(time.time()) + _HEALTH_BODY_SUFFIX,
+        media_type="application/json",
+    )
@@ -0,0 +1,175 @@
+"""
+ASGI middleware for ChatConnect AI Backend.
+
+Implemented at the raw ASGI layer (no Request/Response wrapping) since
+they run on every request.
+"""
+
+import logging
+import time
+import uuid
+
+import structlog
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = structlog.get_logger()
+
+
+class CORSASGIMiddleware:
+    """
+    Emit CORS headers on every HTTP response.
+    
+    Headers are built once at startup. Only when credentials are allowed with
+    a wildcard origin is the request Origin echoed per request (browsers
+    reject "*" on credentialed requests). Preflight requests are answered
+    directly with 204.
+    """
+    
+    ALL_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        allow_origin: str = "*",
+        allow_credentials: bool = False,
+        max_age: int = 600,
+    ) -> None:
+        self.app = app
+        self.echo_origin = allow_credentials and allow_origin == "*"
+        
+        self.response_headers: list[tuple[bytes, bytes]] = []
+        if not self.echo_origin:
+            self.response_headers.append(
+                (b"access-control-allow-origin", allow_origin.encode("latin-1"))
+            )
+        if allow_credentials:
+            self.response_headers.append((b"access-control-allow-credentials", b"true"))
+        if allow_origin != "*" or self.echo_origin:
+            self.response_headers.append((b"vary", b"Origin"))
+        
+        # Wildcards are not honoured on credentialed requests, so list the
+        # methods and echo the requested headers instead
+        self.preflight_headers = [
+            *self.response_headers,
+            (b"access-control-allow-methods", self.ALL_METHODS if allow_credentials else b"*"),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+            (b"content-length", b"0"),
+        ]
+        if not allow_credentials:
+            self.preflight_headers.append((b"access-control-allow-headers", b"*"))
+        self.echo_request_headers = allow_credentials
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        is_options = scope["method"] == "OPTIONS"
+        origin = request_method = request_headers = None
+        if self.echo_origin or is_options:
+            for name, value in scope["headers"]:
+                if name == b"origin":
+                    origin = value
+                elif name == b"access-control-request-method":
+                    request_method = value
+                elif name == b"access-control-request-headers":
+                    request_headers = value
+        
+        origin_headers = (
+            [(b"access-control-allow-origin", origin)] if self.echo_origin and origin else []
+        )
+        
+        if is_options and request_method is not None:
+            headers = [*origin_headers, *self.preflight_headers]
+            if self.echo_request_headers and request_headers:
+                headers.append((b"access-control-allow-headers", request_headers))
+            await send({
+                "type": "http.response.start",
+                "status": 204,
+                "headers": headers,
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        response_headers = [*origin_headers, *self.response_headers]
+        
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*response_headers, *message.get("headers", ())]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cors)
+
+
+class RequestLoggingMiddleware:
+    """
+    Assign a request ID and log one line per HTTP request.
+    
+    The ID is taken from the X-Request-ID header (or generated), stored on
+    `request.state.request_id` and echoed in the response headers for every
+    request. Paths in `excluded_paths` (liveness probes) are not logged.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        excluded_paths: frozenset[str] = frozenset(),
+        log_request_start: bool = False,
+    ) -> None:
+        self.app = app
+        self.excluded_paths = excluded_paths
+        self.log_request_start = log_request_start
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_ns = time.perf_counter_ns()
+        
+        # Generate request ID
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if not request_id:
+            request_id = f"req_{uuid.uuid4().hex}"
+        
+        # Add to request state
+        scope.setdefault("state", {})["request_id"] = request_id
+        
+        # Liveness endpoints get a request ID but no log lines
+        log_request = scope["path"] not in self.excluded_paths
+        
+        if log_request and self.log_request_start:
+            logger.info(
+                "http_request_started",
+                request_id=request_id,
+                method=scope["method"],
+                path=scope["path"],
+            )
+        
+        request_id_header = (b"x-request-id", request_id.encode("latin-1"))
+        status_code = 500
+        
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", ()), request_id_header]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            # Log request (skip building the event when INFO is filtered out)
+            if log_request and logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "http_request",
+                    request_id=request_id,
+                    method=scope["method"],
+                    path=scope["path"],
+                    status_code=status_code,
+                    duration_ms=(time.perf_counter_ns() - start_ns) // 1_000_000,
+                )
@@ -8,53 +8,125 @@ Endpoints:
 - GET /api/widget/documents/{id}/status - Get document processing status
 """
 
-import json
+import asyncio
+import binascii
+import os
+import threading
 import time
-import uuid
+from hmac import compare_digest
 from typing import AsyncGenerator
 
+import asyncpg
+import orjson
 import structlog
-from fastapi import APIRouter, Depends, Header, HTTPException
-from fastapi.responses import StreamingResponse
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
+from src.config.settings import settings
 from src.models.requests import ChatRequest, ProcessDocumentRequest
 from src.models.responses import ChatResponse, DocumentStatusResponse
 
 logger = structlog.get_logger()
 
-router = APIRouter(prefix="/api/widget", tags=["widget"])
+# Settings are frozen, so values read on every request are bound once here
+_INTERNAL_SECRET = settings.internal_api_secret.encode()
+
+router = APIRouter(
+    prefix="/api/widget",
+    tags=["widget"],
+    default_response_class=ORJSONResponse,
+)
+
+
+# =============================================================================
+# Trace IDs
+# =============================================================================
+
+# Random bytes are fetched from the OS in batches and consumed 16 at a time
+_URAND_BATCH_SIZE = 4096
+_URAND_BUF = bytearray()
+_URAND_LOCK = threading.Lock()
+
+# A forked worker must not reuse the parent's buffered bytes
+os.register_at_fork(after_in_child=_URAND_BUF.clear)
+
+
+def _next_trace_id() -> str:
+    """Return a random uuid-formatted trace ID from the batched byte buffer."""
+    with _URAND_LOCK:
+        if len(_URAND_BUF) < 16:
+            _URAND_BUF[:] = os.urandom(_URAND_BATCH_SIZE)
+        h = _URAND_BUF[-16:].hex()
+        del _URAND_BUF[-16:]
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+# =============================================================================
+# SSE Frames
+# =============================================================================
+
+# Pre-encoded frame pieces; chunks are yielded as bytes so Starlette
+# does not re-encode every frame
+_SSE_START = b"event: start\ndata: "
+_SSE_CHUNK = b"event: chunk\ndata: "
+_SSE_SOURCES = b"event: sources\ndata: "
+_SSE_ERROR = b"event: error\ndata: "
+_SSE_DONE = b"event: done\ndata: [DONE]\n\n"
+_SSE_END = b"\n\n"
+_SSE_EMPTY_SOURCES = _SSE_SOURCES + b"[]" + _SSE_END
+
+# Chunk frames are coalesced and written once either limit is reached
+_SSE_FLUSH_BYTES = 1024
+_SSE_FLUSH_INTERVAL = 0.02  # seconds
 
 
 # =============================================================================
 # Dependencies
 # =============================================================================
 
-async def validate_api_key(x_api_key: str = Header(..., alias="x-api-key")) -> dict:
+# Resolved client configs by API key; short TTL so key revocations apply quickly
+_KEY_CACHE: TTLCache[str, dict] = TTLCache(maxsize=10_000, ttl=10)
+
+
+async def get_db_pool(request: Request) -> asyncpg.Pool:
+    """Return the PostgreSQL pool created during application startup."""
+    return request.app.state.pg
+
+
+async def validate_api_key(
+    x_api_key: str = Header(..., alias="x-api-key"),
+    pg: asyncpg.Pool = Depends(get_db_pool),
+) -> dict:
     """
     Validate API key and return client configuration.
     
-    TODO: Actually validate against database.
+    TODO: Actually validate against database (via `pg`).
     """
     if not x_api_key or not x_api_key.startswith("pk_"):
         raise HTTPException(status_code=401, detail="Invalid API key")
     
+    client_config = _KEY_CACHE.get(x_api_key)
+    if client_config is not None:
+        return client_config
+    
     # TODO: Look up client in database
     # For now, return mock config
-    return {
+    client_config = {
         "client_id": "mock_client_123",
         "tier": "free",  # or "paid"
         "model": "gpt-4o-mini",  # or "claude-sonnet-4-5-20250514"
         "system_prompt": None,
     }
+    _KEY_CACHE[x_api_key] = client_config
+    return client_config
 
 
 async def validate_internal_secret(
     x_internal_secret: str = Header(None, alias="X-Internal-Secret")
 ) -> bool:
     """Validate internal API secret for Express -> Python calls."""
-    from src.config.settings import settings
-    
-    if x_internal_secret != settings.internal_api_secret:
+    if not x_internal_secret or not compare_digest(x_internal_secret.encode(), _INTERNAL_SECRET):
         raise HTTPException(status_code=401, detail="Invalid internal secret")
     
     return True
@@ -64,7 +136,9 @@ async def validate_internal_secret(
 # Chat Endpoints
 # =============================================================================
 
-@router.post("/chat", response_model=ChatResponse)
+# Trusted server-built bodies are returned directly (no response_model
+# validation pass); the models below only document the OpenAPI schema
+@router.post("/chat", responses={200: {"model": ChatResponse}})
 async def chat(
     request: ChatRequest,
     client_config: dict = Depends(validate_api_key),
@@ -78,8 +152,8 @@ async def chat(
     4. Log conversation (async)
     5. Return response
     """
-    trace_id = str(uuid.uuid4())
-    start_time = time.time()
+    trace_id = _next_trace_id()
+    start_ns = time.perf_counter_ns()
     
     logger.info(
         "chat_request_received",
@@ -93,7 +167,6 @@ async def chat(
         # For now, return mock response
         
         # Simulate processing time
-        import asyncio
         await asyncio.sleep(0.5)
         
         response_text = (
@@ -106,7 +179,7 @@ async def chat(
             "3. Return sources for the information provided"
         )
         
-        latency_ms = int((time.time() - start_time) * 1000)
+        latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
         
         logger.info(
             "chat_request_completed",
@@ -114,12 +187,12 @@ async def chat(
             latency_ms=latency_ms,
         )
         
-        return ChatResponse(
-            response=response_text,
-            session_id=request.session_id,
-            sources=[],
-            trace_id=trace_id,
-        )
+        return ORJSONResponse({
+            "response": response_text,
+            "session_id": str(request.session_id),
+            "sources": [],
+            "trace_id": trace_id,
+        })
         
     except Exception as e:
         logger.error(
@@ -144,7 +217,7 @@ async def chat_stream(
     - event: sources - Source references
     - event: done - Stream completed
     """
-    trace_id = str(uuid.uuid4())
+    trace_id = _next_trace_id()
     
     logger.info(
         "chat_stream_request_received",
@@ -152,11 +225,11 @@ async def chat_stream(
         client_id=client_config["client_id"],
     )
     
-    async def generate_stream() -> AsyncGenerator[str, None]:
+    async def generate_stream() -> AsyncGenerator[bytes, None]:
         """Generate SSE stream."""
         try:
             # Send start event
-            yield f"event: start\ndata: {trace_id}\n\n"
+            yield _SSE_START + trace_id.encode() + _SSE_END
             
             # TODO: Implement actual streaming workflow
             # For now, simulate streaming response
@@ -167,21 +240,30 @@ async def chat_stream(
                 f"The actual implementation will stream tokens from the LLM in real-time."
             )
             
-            # Stream response in chunks
-            chunk_size = 10
+            # Stream response in chunks, coalescing frames into one write
+            # per _SSE_FLUSH_BYTES or _SSE_FLUSH_INTERVAL
+            loop = asyncio.get_running_loop()
+            buf = bytearray()
+            last_flush = loop.time()
+            chunk_size = 64
             for i in range(0, len(mock_response), chunk_size):
                 chunk = mock_response[i:i + chunk_size]
-                yield f"event: chunk\ndata: {chunk}\n\n"
+                buf += _SSE_CHUNK
+                buf += chunk.encode()
+                buf += _SSE_END
                 
-                # Small delay to simulate streaming
-                import asyncio
-                await asyncio.sleep(0.05)
+                now = loop.time()
+                if len(buf) >= _SSE_FLUSH_BYTES or now - last_flush >= _SSE_FLUSH_INTERVAL:
+                    yield bytes(buf)
+                    buf.clear()
+                    last_flush = now
             
             # Send sources (empty for mock)
-            yield f"event: sources\ndata: {json.dumps([])}\n\n"
+            buf += _SSE_EMPTY_SOURCES
             
-            # Send done event
-            yield "event: done\ndata: [DONE]\n\n"
+            # Send done event, flushing anything still buffered
+            buf += _SSE_DONE
+            yield bytes(buf)
             
             logger.info(
                 "chat_stream_completed",
@@ -194,7 +276,11 @@ async def chat_stream(
                 trace_id=trace_id,
                 error=str(e),
             )
-            yield f"event: error\ndata: {json.dumps({'code': 'STREAM_ERROR', 'message': str(e)})}\n\n"
+            yield (
+                _SSE_ERROR
+                + orjson.dumps({"code": "STREAM_ERROR", "message": str(e)})
+                + _SSE_END
+            )
     
     return StreamingResponse(
         generate_stream(),
@@ -221,13 +307,21 @@ async def process_document(
     
     Called by Express API after file upload.
     
+    0. Decode base64 file data (off the event loop)
     1. Parse document (PDF, DOCX, TXT, CSV)
     2. Chunk text
     3. Generate embeddings
     4. Store in Qdrant
     5. Update status in PostgreSQL
     """
-    trace_id = str(uuid.uuid4())
+    trace_id = _next_trace_id()
+    
+    try:
+        file_bytes = await asyncio.to_thread(
+            binascii.a2b_base64, request.file_data, strict_mode=True
+        )
+    except binascii.Error:
+        raise HTTPException(status_code=400, detail="Invalid base64 file data") from None
     
     logger.info(
         "document_process_request",
@@ -235,6 +329,7 @@ async def process_document(
         document_id=request.document_id,
         client_id=request.client_id,
         file_type=request.file_type,
+        file_size=len(file_bytes),
     )
     
     # TODO: Implement actual document processing
@@ -249,7 +344,7 @@ async def process_document(
     }
 
 
-@router.get("/documents/{document_id}/status", response_model=DocumentStatusResponse)
+@router.get("/documents/{document_id}/status", responses={200: {"model": DocumentStatusResponse}})
 async def get_document_status(
     document_id: str,
     _: bool = Depends(validate_internal_secret),
@@ -258,13 +353,15 @@ async def get_document_status(
     
     # TODO: Look up actual status from database
     
-    return DocumentStatusResponse(
-        document_id=document_id,
-        status="completed",
-        progress=100,
-        chunks_total=10,
-        chunks_processed=10,
-    )
+    return ORJSONResponse({
+        "document_id": document_id,
+        "status": "completed",
+        "progress": 100,
+        "current_step": None,
+        "chunks_total": 10,
+        "chunks_processed": 10,
+        "error_message": None,
+    })
 
 
 # =============================================================================
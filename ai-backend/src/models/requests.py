@@ -2,7 +2,8 @@
 Request models for ChatConnect AI Backend.
 """
 
-from typing import Any
+from typing import Any, Literal
+from uuid import UUID
 
 from pydantic import BaseModel, Field
 
@@ -11,7 +12,7 @@ class ChatRequest(BaseModel):
     """Chat request from widget."""
     
     message: str = Field(..., min_length=1, max_length=2000)
-    session_id: str = Field(..., pattern=r"^[a-f0-9-]{36}$")
+    session_id: UUID
     metadata: dict[str, Any] | None = None
 
 
@@ -20,7 +21,7 @@ class ProcessDocumentRequest(BaseModel):
     
     document_id: str
     client_id: str
-    file_data: str  # Base64 encoded
-    file_type: str = Field(..., pattern=r"^(pdf|docx|txt|csv)$")
+    file_data: bytes  # Base64 encoded (kept as ASCII bytes; decoded by the route)
+    file_type: Literal["pdf", "docx", "txt", "csv"]
     original_name: str
     metadata: dict[str, Any] | None = None
@@ -0,0 +1,262 @@
+"""
+Tests for the ASGI middleware in src/api/middleware.py.
+"""
+
+import re
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.api import middleware
+from src.api.main import global_exception_handler
+from src.api.middleware import CORSASGIMiddleware, RequestLoggingMiddleware
+
+ORIGIN = "https://conference.example.com"
+
+
+# =============================================================================
+# CORSASGIMiddleware
+# =============================================================================
+
+def make_cors_client(**kwargs) -> TestClient:
+    """Build a client for a one-route app wrapped in CORSASGIMiddleware."""
+    async def endpoint(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(f"app:{request.method}")
+    
+    app = Starlette(routes=[Route("/", endpoint, methods=["GET", "OPTIONS"])])
+    app.add_middleware(CORSASGIMiddleware, **kwargs)
+    return TestClient(app)
+
+
+def test_cors_credentials_echoes_origin_with_vary():
+    client = make_cors_client(allow_origin="*", allow_credentials=True)
+    
+    response = client.get("/", headers={"Origin": ORIGIN})
+    
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert response.headers["vary"] == "Origin"
+
+
+def test_cors_credentials_without_origin_header_sends_no_allow_origin():
+    client = make_cors_client(allow_origin="*", allow_credentials=True)
+    
+    response = client.get("/")
+    
+    assert response.status_code == 200
+    assert "access-control-allow-origin" not in response.headers
+
+
+def test_cors_credentials_preflight_lists_methods_and_echoes_headers():
+    client = make_cors_client(allow_origin="*", allow_credentials=True, max_age=600)
+    
+    response = client.options(
+        "/",
+        headers={
+            "Origin": ORIGIN,
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "x-api-key, content-type",
+        },
+    )
+    
+    assert response.status_code == 204
+    assert response.content == b""
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert response.headers["access-control-allow-methods"] == (
+        "DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+    )
+    assert response.headers["access-control-allow-headers"] == "x-api-key, content-type"
+    assert response.headers["access-control-max-age"] == "600"
+
+
+def test_cors_plain_options_reaches_app():
+    client = make_cors_client(allow_origin="*", allow_credentials=True)
+    
+    response = client.options("/", headers={"Origin": ORIGIN})
+    
+    assert response.status_code == 200
+    assert response.text == "app:OPTIONS"
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+
+
+def test_cors_without_credentials_uses_wildcards():
+    client = make_cors_client(allow_origin="*", allow_credentials=False)
+    
+    response = client.get("/", headers={"Origin": ORIGIN})
+    assert response.headers["access-control-allow-origin"] == "*"
+    assert "access-control-allow-credentials" not in response.headers
+    assert "vary" not in response.headers
+    
+    preflight = client.options(
+        "/",
+        headers={"Origin": ORIGIN, "Access-Control-Request-Method": "POST"},
+    )
+    assert preflight.status_code == 204
+    assert preflight.headers["access-control-allow-origin"] == "*"
+    assert preflight.headers["access-control-allow-methods"] == "*"
+    assert preflight.headers["access-control-allow-headers"] == "*"
+
+
+def test_cors_fixed_origin_is_sent_with_vary():
+    client = make_cors_client(allow_origin=ORIGIN, allow_credentials=False)
+    
+    response = client.get("/", headers={"Origin": "https://other.example.com"})
+    
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+    assert response.headers["vary"] == "Origin"
+
+
+# =============================================================================
+# RequestLoggingMiddleware
+# =============================================================================
+
+class RecordingLogger:
+    """Stand-in for the module logger that records info() calls."""
+    
+    def __init__(self) -> None:
+        self.events: list[tuple[str, dict]] = []
+    
+    def isEnabledFor(self, level: int) -> bool:
+        return True
+    
+    def info(self, event: str, **kwargs) -> None:
+        self.events.append((event, kwargs))
+
+
+@pytest.fixture
+def log_events(monkeypatch) -> list[tuple[str, dict]]:
+    recorder = RecordingLogger()
+    monkeypatch.setattr(middleware, "logger", recorder)
+    return recorder.events
+
+
+async def echo_request_id(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(request.state.request_id)
+
+
+async def stream_events(request: Request) -> StreamingResponse:
+    async def generate():
+        yield b"event: start\ndata: 1\n\n"
+        yield b"event: done\ndata: [DONE]\n\n"
+    
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+
+async def fail(request: Request) -> PlainTextResponse:
+    raise RuntimeError("boom")
+
+
+def make_logging_client(**kwargs) -> TestClient:
+    """Build a client for an app wrapped in RequestLoggingMiddleware."""
+    app = Starlette(
+        routes=[
+            Route("/echo", echo_request_id),
+            Route("/health", echo_request_id),
+            Route("/stream", stream_events),
+            Route("/fail", fail),
+        ],
+        middleware=[Middleware(RequestLoggingMiddleware, **kwargs)],
+        exception_handlers={Exception: global_exception_handler},
+    )
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_request_id_header_is_echoed(log_events):
+    client = make_logging_client()
+    
+    response = client.get("/echo", headers={"X-Request-ID": "req-from-express"})
+    
+    assert response.headers["x-request-id"] == "req-from-express"
+    assert response.text == "req-from-express"
+
+
+def test_request_id_is_generated_when_missing(log_events):
+    client = make_logging_client()
+    
+    response = client.get("/echo")
+    
+    request_id = response.headers["x-request-id"]
+    assert re.fullmatch(r"req_[0-9a-f]{32}", request_id)
+    assert response.text == request_id
+
+
+def test_request_id_reaches_global_exception_handler(log_events):
+    client = make_logging_client()
+    
+    response = client.get("/fail", headers={"X-Request-ID": "req-failing"})
+    
+    assert response.status_code == 500
+    assert response.json() == {
+        "error": {
+            "code": "INTERNAL_ERROR",
+            "message": "An unexpected error occurred",
+        },
+        "request_id": "req-failing",
+    }
+
+
+def test_logs_500_when_app_raises_before_response(log_events):
+    async def raising_app(scope, receive, send):
+        raise RuntimeError("boom")
+    
+    client = TestClient(RequestLoggingMiddleware(raising_app), raise_server_exceptions=False)
+    
+    client.get("/anything", headers={"X-Request-ID": "req-crash"})
+    
+    assert log_events == [
+        (
+            "http_request",
+            {
+                "request_id": "req-crash",
+                "method": "GET",
+                "path": "/anything",
+                "status_code": 500,
+                "duration_ms": log_events[0][1]["duration_ms"],
+            },
+        ),
+    ]
+
+
+def test_sse_response_gets_request_id_header(log_events):
+    client = make_logging_client()
+    
+    response = client.get("/stream", headers={"X-Request-ID": "req-stream"})
+    
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["x-request-id"] == "req-stream"
+    assert response.text.endswith("event: done\ndata: [DONE]\n\n")
+
+
+def test_logs_one_line_per_request(log_events):
+    client = make_logging_client()
+    
+    client.get("/echo", headers={"X-Request-ID": "req-1"})
+    
+    assert [event for event, _ in log_events] == ["http_request"]
+    assert log_events[0][1]["status_code"] == 200
+    assert log_events[0][1]["path"] == "/echo"
+
+
+def test_log_request_start_adds_started_line(log_events):
+    client = make_logging_client(log_request_start=True)
+    
+    client.get("/echo")
+    
+    assert [event for event, _ in log_events] == ["http_request_started", "http_request"]
+
+
+def test_excluded_paths_get_request_id_but_no_logs(log_events):
+    client = make_logging_client(excluded_paths=frozenset({"/health"}))
+    
+    response = client.get("/health", headers={"X-Request-ID": "req-probe"})
+    
+    assert response.headers["x-request-id"] == "req-probe"
+    assert response.text == "req-probe"
+    assert log_events == []